@@ -17,7 +17,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Mock object for unittests."""
 
-from collections import defaultdict
 from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from functools import partial
@@ -33,7 +32,8 @@ def injected(func, **kwargs):
         func = func.im_func
     # save and replace current function globals as to kwargs
     func_globals = func.func_globals
-    saved = dict((k, func_globals[k]) for k in kwargs if k in func_globals)
+    keys = tuple(k for k in kwargs if k in func_globals)
+    saved = dict(zip(keys, map(func_globals.__getitem__, keys)))
     func_globals.update(kwargs)
     # context is now ready to be used
     yield
@@ -45,7 +45,8 @@ def injected(func, **kwargs):
 def replaced(obj, **attrs):
     """Replace attribute in object while in context mode."""
     # save and replace current attributes
-    saved = dict((k, getattr(obj, k)) for k in attrs)
+    keys = tuple(attrs)
+    saved = dict(zip(keys, map(partial(getattr, obj), keys)))
     for (name, attr) in attrs.iteritems():
         setattr(obj, name, attr)
     # context is ready
@@ -90,7 +91,7 @@ class Omnivore(object):
         self.retvals = dict()
         for (key, value) in kwargs.iteritems():
             self.retvals[key] = iter(value)
-        self.called = defaultdict(list)
+        self.called = dict()
 
     def __enter__(self):
         self.called["__enter__"] = True
@@ -100,7 +101,7 @@ class Omnivore(object):
         self.called["__exit__"] = (exctype, excvalue, exctb)
 
     def method(self, methodname, *args, **kwargs):
-        self.called[methodname].append((args, kwargs))
+        self.called.setdefault(methodname, []).append((args, kwargs))
         generator = self.retvals.get(methodname)
         if generator is None:
             return None
@@ -110,7 +111,11 @@ class Omnivore(object):
         return value
 
     def __getattr__(self, name):
-        return partial(self.method, name)
+        # memoize the bound partial so further lookups of the same name
+        # are plain attribute reads that bypass __getattr__
+        bound = partial(self.method, name)
+        self.__dict__[name] = bound
+        return bound
 
     def __call__(self, *args, **kwargs):
         return self.method("__call__", *args, **kwargs)
@@ -141,6 +146,23 @@ class HTTPConnection(object):
         self.response = Response()
         self.closed = False
 
+    def reset(self):
+        """Restore the initial state so the instance can be reused."""
+        # tests may shadow methods on the shared instance, e.g. assign
+        # a failing request; drop such overrides as well
+        for name in ("request", "getresponse", "close"):
+            self.__dict__.pop(name, None)
+        self.method = None
+        self.path = None
+        self.body = None
+        self.headers = None
+        if isinstance(self.response, Response):
+            self.response.reset()
+        else:
+            # a test swapped in some other object
+            self.response = Response()
+        self.closed = False
+
     def request(self, method, path, body=None, headers=None):
         self.method = method
         self.path = path
@@ -153,7 +175,7 @@ class HTTPConnection(object):
     def __exit__(self, *args):
         pass
 
-    def getresponse(self):
+    def getresponse(self, buffering=False):
         return self.response
 
     def close(self):
@@ -174,16 +196,38 @@ class Response(urllib2.HTTPError):
     """Mock urllib2 response object."""
 
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Restore the initial state so the instance can be reused."""
         self.code = None
         self.content = ""
         self.version = 11
         self.reason = "The reason"
         self.headers = dict()
         self.status = 200
+        self._all_read = False
 
     def getheaders(self):
         return self.headers
 
-    def read(self):
-        return self.content
+    def getheader(self, name, default=None):
+        for (key, value) in self.headers.iteritems():
+            if key.lower() == name.lower():
+                return value
+        return default
+
+    def read(self, size=None):
+        if size is None:
+            self._all_read = True
+            return self.content
+        (data, self.content) = (self.content[:size], self.content[size:])
+        if not self.content:
+            self._all_read = True
+        return data
+
+    def isclosed(self):
+        # like httplib: False until the body was read to the end, even
+        # when there is no body at all
+        return self._all_read
 
@@ -82,9 +82,8 @@ class TestCreatePropPatch(unittest.TestCase):
                               '<propertyupdate xmlns="DAV:" xmlns:CADN="CADN:">'
                               '<set>'
                               '<prop>'
-                              '<CADN:created>2009-09-09 13:31'
                               '<CADN:author>me</CADN:author>'
-                              '</CADN:created>'
+                              '<CADN:created>2009-09-09 13:31</CADN:created>'
                               '</prop>'
                               '</set>'
                               '</propertyupdate>')
@@ -114,9 +113,8 @@ class TestCreatePropPatch(unittest.TestCase):
                               ' xmlns:DEL="DEL:">'
                               '<set>'
                               '<prop>'
-                              '<CADN:created>2009-09-09 13:31'
                               '<CADN:author>me</CADN:author>'
-                              '</CADN:created>'
+                              '<CADN:created>2009-09-09 13:31</CADN:created>'
                               '</prop>'
                               '</set>'
                               '<remove>'
@@ -43,10 +43,9 @@ import Mock
 
 PYTHONVERSION = sys.version_info[:2] # (2, 5) or (2, 6)
 
-if PYTHONVERSION >= (2, 7):
-    from xml.etree.ElementTree import ParseError
-else:
-    from xml.parsers.expat import ExpatError as ParseError
+# the exception class the library actually raises: on Python 2.7 the
+# cElementTree ParseError is distinct from the pure-Python one
+from tinydav import ParseError
 
 MULTISTATUS = """\
 <?xml version="1.0" encoding="utf-8"?>
@@ -66,6 +65,33 @@ MULTISTATUS = """\
 </D:multistatus>
 """
 
+MULTISTATUS_SIBLINGS = """\
+<?xml version="1.0" encoding="utf-8"?>
+<D:multistatus xmlns:D="DAV:">
+<D:response>
+<D:href>/coll/</D:href>
+<D:propstat>
+<D:prop><D:getetag>parent</D:getetag></D:prop>
+<D:status>HTTP/1.1 200 OK</D:status>
+</D:propstat>
+</D:response>
+<D:response>
+<D:href>/coll/foo</D:href>
+<D:propstat>
+<D:prop><D:getetag>etag-foo</D:getetag></D:prop>
+<D:status>HTTP/1.1 200 OK</D:status>
+</D:propstat>
+</D:response>
+<D:response>
+<D:href>/coll/bar</D:href>
+<D:propstat>
+<D:prop><D:getetag>etag-bar</D:getetag></D:prop>
+<D:status>HTTP/1.1 200 OK</D:status>
+</D:propstat>
+</D:response>
+</D:multistatus>
+"""
+
 # unbound prefix
 MULTISTATUS_BROKEN = """\
 <?xml version="1.0" encoding="utf-8"?>
@@ -158,10 +184,15 @@ opaquelocktoken:e71d4fae-5dec-22d6-fea5-00a0c91e6be4
 
 class HTTPClientTestCase(unittest.TestCase):
     """Test the HTTPClient class."""
+    # shared across tests and reset in setUp to avoid reallocation churn
+    _con = Mock.HTTPConnection()
+
     def setUp(self):
         """Setup the client."""
+        tinydav._POOLS.clear()
         self.http = HTTPClient("127.0.0.1", 80)
-        self.con = Mock.HTTPConnection()
+        self.con = self._con
+        self.con.reset()
         self.http._getconnection = lambda: self.con
 
     def test_init(self):
@@ -222,6 +253,54 @@ class HTTPClientTestCase(unittest.TestCase):
             self.assertEqual(call_log["timeout"], 300)
             self.assertEqual(call_log.get("source_address"), "here.loc")
 
+    def test_acquire_release(self):
+        """Test HTTPClient._acquire and HTTPClient._release."""
+        acquired = self.http._acquire()
+        self.assertTrue(acquired is self.con)
+        # a released connection is handed out again
+        self.http._release(acquired, True)
+        self.assertTrue(self.http._acquire() is self.con)
+        # connections released with keep=False are closed
+        self.http._release(self.con, False)
+        self.assertTrue(self.con.closed)
+
+    def test_release_full_pool(self):
+        """Test HTTPClient._release with a full pool."""
+        http = HTTPClient("127.0.0.1", 80, pool_size=1)
+        http._release(Mock.HTTPConnection(), True)
+        overflow = Mock.HTTPConnection()
+        http._release(overflow, True)
+        self.assertTrue(overflow.closed)
+
+    def test_close(self):
+        """Test HTTPClient.close."""
+        self.http._release(self.http._acquire(), True)
+        self.http.close()
+        self.assertTrue(self.con.closed)
+        # closing with an empty pool is a no-op
+        self.http.close()
+
+    def test_request_stale_connection(self):
+        """Test HTTPClient._request with a stale keep-alive connection."""
+        def badstatusline(*args, **kwargs):
+            raise httplib.BadStatusLine("")
+        self.con.request = badstatusline
+        retry = Mock.HTTPConnection()
+        cons = iter([self.con, retry])
+        self.http._getconnection = lambda: cons.next()
+        self.assertEqual(self.http._request("GET", "/foo"), 200)
+
+    def test_request_stale_connection_not_idempotent(self):
+        """Test HTTPClient._request does not retry non-idempotent methods."""
+        def badstatusline(*args, **kwargs):
+            raise httplib.BadStatusLine("")
+        self.con.request = badstatusline
+        self.assertRaises(
+            httplib.BadStatusLine,
+            self.http._request,
+            "POST", "/foo"
+        )
+
     def test_request(self):
         """Test HTTPClient._request."""
         headers = {"X-Test": "Hello"}
@@ -241,6 +320,24 @@ class HTTPClientTestCase(unittest.TestCase):
         self.con.response.status = 500
         self.assertRaises(HTTPServerError, self.http._request, "POST", "/foo")
 
+    def test_request_release_after_read(self):
+        """Test HTTPClient._request pools the connection after body read."""
+        self.con.response.content = "Foobar"
+        resp = self.http._request("GET", "/foo")
+        pool = tinydav._POOLS[("http", "127.0.0.1", 80)]
+        # body not read yet: the connection is still attached to the response
+        self.assertTrue(pool.empty())
+        self.assertEqual(resp.content, "Foobar")
+        self.assertTrue(pool.get_nowait() is self.con)
+
+    def test_request_release_bodyless(self):
+        """Test HTTPClient._request pools the connection for a 204."""
+        self.con.response.status = 204
+        self.http._request("DELETE", "/foo")
+        pool = tinydav._POOLS[("http", "127.0.0.1", 80)]
+        # no body can follow: the connection is released immediately
+        self.assertTrue(pool.get_nowait() is self.con)
+
     def test_setcookie(self):
         """Test HTTPClient.setcookie."""
         self.http.setcookie(CookieJar())
@@ -283,6 +380,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(uri, "/foo%20bar/baz?foo=b%C3%A4r")
         expect = {
             'Authorization': 'Basic bWU6c2VjcmV0',
+            'Connection': 'keep-alive',
             'X-Test': 'Hello',
         }
         self.assertEqual(headers, expect)
@@ -295,7 +393,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.get("/index", None, query=query), 200)
         self.assertEqual(self.con.method, "GET")
         self.assertEqual(self.con.path, "/index?path=%2Ffoo%2Fbar")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_post(self):
         """Test HTTPClient.post."""
@@ -306,7 +404,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.post("/index", None, query=query), 200)
         self.assertEqual(self.con.method, "POST")
         self.assertEqual(self.con.path, "/index?path=%2Ffoo%2Fbar")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_post_py25(self):
         """Test HTTPClient.post with Python 2.5."""
@@ -318,7 +416,7 @@ class HTTPClientTestCase(unittest.TestCase):
             self.assertEqual(self.http.post("/index", data), 200)
             self.assertEqual(self.con.method, "POST")
             self.assertEqual(self.con.path, "/index")
-            self.assertTrue(self.con.closed)
+            self.assertFalse(self.con.closed)
 
     def test_post_content_none(self):
         """Test HTTPClient.post with None as content."""
@@ -328,7 +426,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.post("/index", None, query=query), 200)
         self.assertEqual(self.con.method, "POST")
         self.assertEqual(self.con.path, "/index?path=%2Ffoo%2Fbar")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_post_no_query(self):
         """Test HTTPClient.post without query string."""
@@ -338,7 +436,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.post("/index", data), 200)
         self.assertEqual(self.con.method, "POST")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_post_form_data(self):
         """Test HTTPClient.post form-data."""
@@ -367,7 +465,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(resp, 200)
         self.assertEqual(self.con.method, "POST")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_options(self):
         """Test HTTPClient.options."""
@@ -375,7 +473,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.options("/index"), 200)
         self.assertEqual(self.con.method, "OPTIONS")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_head(self):
         """Test HTTPClient.head."""
@@ -383,7 +481,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.head("/index"), 200)
         self.assertEqual(self.con.method, "HEAD")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_delete(self):
         """Test HTTPClient.delete."""
@@ -391,7 +489,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.delete("/index"), 200)
         self.assertEqual(self.con.method, "DELETE")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_trace(self):
         """Test HTTPClient.trace."""
@@ -399,7 +497,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.trace("/index"), 200)
         self.assertEqual(self.con.method, "TRACE")
         self.assertEqual(self.con.path, "/index")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_trace_maxforwards_via(self):
         """Test HTTPClient.trace with given maxforwards and via."""
@@ -409,7 +507,7 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.path, "/index")
         self.assertEqual(self.con.headers.get("Max-Forwards"), "5")
         self.assertEqual(self.con.headers.get("Via"), "a, b")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
     def test_connect(self):
         """Test HTTPClient.connect."""
@@ -417,16 +515,21 @@ class HTTPClientTestCase(unittest.TestCase):
         self.assertEqual(self.http.connect("/"), 200)
         self.assertEqual(self.con.method, "CONNECT")
         self.assertEqual(self.con.path, "/")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
 
 
 class CoreWebDAVClientTestCase(unittest.TestCase):
     """Test the CoreWebDAVClient class."""
+    # shared across tests and reset in setUp to avoid reallocation churn
+    _con = Mock.HTTPConnection()
+
     def setUp(self):
         """Setup the client."""
+        tinydav._POOLS.clear()
         self.dav = CoreWebDAVClient("127.0.0.1", 80)
         self.dav.setbasicauth("test", "passwd")
-        self.con = Mock.HTTPConnection()
+        self.con = self._con
+        self.con.reset()
         self.dav._getconnection = lambda: self.con
         response = Mock.Response()
         response.content = LOCKDISCOVERY
@@ -446,6 +549,7 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(source, "/foo%20bar/baz")
         exp_headers = {
             "Destination": "http://127.0.0.1:80/dest/in/ation",
+            "Connection": "keep-alive",
             "Overwrite": "F",
             "Authorization": "Basic bWU6c2VjcmV0",
             "X-Test": "Hello",
@@ -465,6 +569,7 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(source, "/foo%20bar/baz/")
         exp_headers = {
             "Destination": "http://127.0.0.1:80/dest/in/ation",
+            "Connection": "keep-alive",
             "Depth": "0",
             "Overwrite": "T",
             "Authorization": "Basic bWU6c2VjcmV0",
@@ -493,7 +598,7 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.dav.mkcol("/foobar"), 201)
         self.assertEqual(self.con.method, "MKCOL")
         self.assertEqual(self.con.path, "/foobar")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_propfind(self):
@@ -505,7 +610,7 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "PROPFIND")
         self.assertEqual(self.con.path, "/foobar")
         self.assertEqual(self.con.headers["Depth"], "0")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_propfind_depth_1(self):
@@ -517,9 +622,106 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "PROPFIND")
         self.assertEqual(self.con.path, "/foobar")
         self.assertEqual(self.con.headers["Depth"], "1")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
+    def test_propfind_cache(self):
+        """Test CoreWebDAVClient.propfind with the response cache."""
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        self.con.response.headers["etag"] = '"foobar"'
+        first = self.dav.propfind("/foobar")
+        self.assertEqual(first, 207)
+        # the recorded etag is sent and a 304 is served from the cache
+        self.con.response = Mock.Response()
+        self.con.response.status = 304
+        second = self.dav.propfind("/foobar")
+        self.assertEqual(self.con.headers["If-None-Match"], '"foobar"')
+        self.assertTrue(second is first)
+        # another depth is another cache entry: no revalidation
+        self.con.response = Mock.Response()
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        depth_one = self.dav.propfind("/foobar", 1)
+        self.assertFalse("If-None-Match" in self.con.headers)
+        self.assertEqual(depth_one, 207)
+        # requests changing server state invalidate the cached entry
+        self.con.response = Mock.Response()
+        self.con.response.status = 204
+        self.dav.delete("/foobar")
+        self.con.response = Mock.Response()
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        third = self.dav.propfind("/foobar")
+        self.assertFalse("If-None-Match" in self.con.headers)
+        self.assertEqual(third, 207)
+
+    def test_propfind_cache_no_304(self):
+        """Test CoreWebDAVClient.propfind does not cache a 304 response."""
+        # a caller-supplied If-None-Match may yield a 304 with an etag
+        self.con.response.status = 304
+        self.con.response.headers["etag"] = '"foobar"'
+        first = self.dav.propfind("/foobar",
+                                  headers={"If-None-Match": '"foobar"'})
+        self.assertEqual(first, 304)
+        # the bodyless 304 must not serve the next request
+        self.con.response = Mock.Response()
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        second = self.dav.propfind("/foobar")
+        self.assertEqual(second, 207)
+        self.assertFalse("If-None-Match" in self.con.headers)
+
+    def test_propfind_cache_disabled(self):
+        """Test CoreWebDAVClient.propfind with disabled cache."""
+        self.dav.cache = None
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        self.con.response.headers["etag"] = '"foobar"'
+        self.assertEqual(self.dav.propfind("/foobar"), 207)
+        self.assertEqual(self.dav.propfind("/foobar"), 207)
+        self.assertFalse("If-None-Match" in self.con.headers)
+
+    def test_propfind_body_cache(self):
+        """Test that identical PROPFIND bodies are built only once."""
+        tinydav._BODY_CACHE.clear()
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        body = tinydav.creator.create_propfind()
+        create = Mock.omnivore_func(body)
+        with replaced(tinydav.creator, create_propfind=create):
+            self.dav.propfind("/foo")
+            self.dav.propfind("/bar")
+        self.assertEqual(create.callcount, 1)
+        self.assertEqual(self.con.body, body)
+
+    def test_propfind_many(self):
+        """Test CoreWebDAVClient.propfind_many."""
+        # prepare mock connection
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS_SIBLINGS
+        uris = ["/coll/foo", "/coll/bar", "/coll/baz"]
+        result = self.dav.propfind_many(uris)
+        # siblings are collapsed into one Depth: 1 request on the parent
+        self.assertEqual(self.con.method, "PROPFIND")
+        self.assertEqual(self.con.path, "/coll/")
+        self.assertEqual(self.con.headers["Depth"], "1")
+        self.assertEqual(result["/coll/foo"]["getetag"].text, "etag-foo")
+        self.assertEqual(result["/coll/bar"]["getetag"].text, "etag-bar")
+        # no response for this uri in the multistatus
+        self.assertEqual(result["/coll/baz"], None)
+
+    def test_propfind_many_single(self):
+        """Test CoreWebDAVClient.propfind_many with a single uri."""
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        uri = "/3/38/38f/38fa476aa97a4b2baeb41a481fdca00b"
+        result = self.dav.propfind_many([uri])
+        # a lone uri is fetched directly with Depth: 0
+        self.assertEqual(self.con.path, urllib.quote(uri))
+        self.assertEqual(self.con.headers["Depth"], "0")
+        self.assertEqual(result[uri]["getetag"].text, "6ca7-364-475e65375ce80")
+
     def test_propfind_illegal_depth(self):
         """Test CoreWebDAVClient.propfind with illegal depth."""
         # prepare mock connection
@@ -544,9 +746,18 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
             self.assertEqual(self.con.body, "Test content.")
         else:
             self.assertEqual(self.con.body, self.con.response)
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
+    def test_put_small_file(self):
+        """Test CoreWebDAVClient.put with a small seekable file."""
+        self.con.response.status = 201
+        small = StringIO("Test content.")
+        self.assertEqual(self.dav.put("/foobar", small), 201)
+        # small bodies are coalesced into a single string
+        self.assertEqual(self.con.body, "Test content.")
+        self.assertEqual(self.con.headers["Content-Length"], "13")
+
     def test_proppatch(self):
         """Test CoreWebDAVClient.proppatch."""
         self.con.response.status = 207
@@ -555,6 +766,21 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         ns = {"CADN": "CADN:"}
         self.assertEqual(207, self.dav.proppatch("/foobar", props, None, ns))
 
+    def test_proppatch_body_cache(self):
+        """Test that identical PROPPATCH bodies are built only once."""
+        tinydav._BODY_CACHE.clear()
+        self.con.response.status = 207
+        self.con.response.content = MULTISTATUS
+        props = {"CADN:author": "me"}
+        ns = {"CADN": "CADN:"}
+        body = tinydav.creator.create_proppatch(props, None, ns)
+        create = Mock.omnivore_func(body)
+        with replaced(tinydav.creator, create_proppatch=create):
+            self.dav.proppatch("/foo", props, None, ns)
+            self.dav.proppatch("/bar", props, None, ns)
+        self.assertEqual(create.callcount, 1)
+        self.assertEqual(self.con.body, body)
+
     def test_proppatch_noprops(self):
         """Test CoreWebDAVClient.proppatch with no defined properties."""
         ns = {"CADN": "CADN:"}
@@ -645,6 +871,30 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(resp, 200)
         self.assertEqual(self.con.headers["Depth"], "0")
 
+    def test_lock_body_cache(self):
+        """Test that identical LOCK bodies are built only once."""
+        tinydav._BODY_CACHE.clear()
+        self.con.response.status = 200
+        body = tinydav.creator.create_lock()
+        create = Mock.omnivore_func(body)
+        with replaced(tinydav.creator, create_lock=create):
+            self.dav.lock("/foo")
+            self.dav.lock("/bar")
+        self.assertEqual(create.callcount, 1)
+        self.assertEqual(self.con.body, body)
+
+    def test_lock_body_cache_element_owner(self):
+        """Test that an element owner bypasses the LOCK body cache."""
+        tinydav._BODY_CACHE.clear()
+        self.con.response.status = 200
+        owner = tinydav.creator.Element("href")
+        body = tinydav.creator.create_lock(owner=owner)
+        create = Mock.omnivore_func(body)
+        with replaced(tinydav.creator, create_lock=create):
+            self.dav.lock("/foo", owner=owner)
+            self.dav.lock("/foo", owner=owner)
+        self.assertEqual(create.callcount, 2)
+
     def test_lock_illegaldepth(self):
         """Test CoreWebDAVClient.lock with given illegal depth."""
         self.assertRaises(
@@ -691,11 +941,16 @@ class CoreWebDAVClientTestCase(unittest.TestCase):
 
 class ExtendedWebDAVClientTestCase(unittest.TestCase):
     """Test the ExtendedWebDAVClient class."""
+    # shared across tests and reset in setUp to avoid reallocation churn
+    _con = Mock.HTTPConnection()
+
     def setUp(self):
         """Setup the client."""
+        tinydav._POOLS.clear()
         self.dav = ExtendedWebDAVClient("127.0.0.1", 80)
         self.dav.setbasicauth("test", "passwd")
-        self.con = Mock.HTTPConnection()
+        self.con = self._con
+        self.con.reset()
         self.dav._getconnection = lambda: self.con
 
     def test_version_tree_report_is_report(self):
@@ -712,7 +967,7 @@ class ExtendedWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "REPORT")
         self.assertEqual(self.con.path, "/foo.html")
         self.assertEqual(self.con.headers["Depth"], "0")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_version_tree_report_depth_1(self):
@@ -725,7 +980,7 @@ class ExtendedWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "REPORT")
         self.assertEqual(self.con.path, "/foo.html")
         self.assertEqual(self.con.headers["Depth"], "1")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_version_tree_report_illegal_depth(self):
@@ -748,7 +1003,7 @@ class ExtendedWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "REPORT")
         self.assertEqual(self.con.path, "/foo.html")
         self.assertEqual(self.con.headers["Depth"], "0")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_expand_property_report_depth_1(self):
@@ -761,7 +1016,7 @@ class ExtendedWebDAVClientTestCase(unittest.TestCase):
         self.assertEqual(self.con.method, "REPORT")
         self.assertEqual(self.con.path, "/foo.html")
         self.assertEqual(self.con.headers["Depth"], "1")
-        self.assertTrue(self.con.closed)
+        self.assertFalse(self.con.closed)
         self.assertTrue("Authorization" in self.con.headers)
 
     def test_expand_property_report_illegal_depth(self):
@@ -823,6 +1078,41 @@ class HTTPResponseTestCase(unittest.TestCase):
         self.assertEqual(self.httpresponse, 207)
         self.assertEqual(self.httpresponse401, 401)
 
+    def test_get_header(self):
+        """Test HTTPResponse.get_header."""
+        response = Mock.Response()
+        response.headers["X-Test"] = "Hello"
+        httpresponse = HTTPResponse(response)
+        self.assertEqual(httpresponse.get_header("X-Test"), "Hello")
+        # lookup is case-insensitive
+        self.assertEqual(httpresponse.get_header("x-test"), "Hello")
+        self.assertEqual(httpresponse.get_header("Missing", "nope"), "nope")
+
+    def test_content_lazy(self):
+        """Test lazy reading of HTTPResponse.content."""
+        response = Mock.Response()
+        response.content = "Foobar"
+        httpresponse = HTTPResponse(response)
+        self.assertTrue(httpresponse._content is None)
+        self.assertEqual(httpresponse.content, "Foobar")
+        # the content is cached after the first access
+        response.content = "changed"
+        self.assertEqual(httpresponse.content, "Foobar")
+
+    def test_stream(self):
+        """Test HTTPResponse.stream."""
+        response = Mock.Response()
+        response.content = "abcdefgh"
+        httpresponse = HTTPResponse(response)
+        self.assertEqual(list(httpresponse.stream(3)), ["abc", "def", "gh"])
+        self.assertEqual(httpresponse.content, "")
+        # already read content is yielded as a single chunk
+        response = Mock.Response()
+        response.content = "Foobar"
+        httpresponse = HTTPResponse(response)
+        self.assertEqual(httpresponse.content, "Foobar")
+        self.assertEqual(list(httpresponse.stream(3)), ["Foobar"])
+
 
 class WebDAVResponseTestCase(unittest.TestCase):
     """Test the WebDAVResponse class."""
@@ -837,12 +1127,12 @@ class WebDAVResponseTestCase(unittest.TestCase):
         # parsing
         response.status = 207
         davresponse = WebDAVResponse(response)
-        self.assertTrue(bool(davresponse._etree.getroot()))
+        self.assertEqual(len(davresponse._entries), 1)
         # broken xml
         response.status = 207
         response.content = MULTISTATUS_BROKEN
         davresponse = WebDAVResponse(response)
-        self.assertTrue(bool(davresponse._etree.getroot()))
+        self.assertEqual(len(davresponse._entries), 0)
         self.assertTrue(isinstance(davresponse.parse_error, ParseError))
 
     def test_len(self):
@@ -906,9 +1196,9 @@ class WebDAVResponseTestCase(unittest.TestCase):
         response.status = 200
         davresponse = WebDAVResponse(response)
         mockparser = Mock.Omnivore()
-        with replaced(davresponse, _parse_xml_content=mockparser):
+        with replaced(davresponse, _parse_multistatus=mockparser):
             self.assertFalse(davresponse.is_multistatus)
-            self.assertEquals(len(mockparser.called["__call__"]), 0)
+            self.assertEquals(len(mockparser.called.get("__call__", [])), 0)
             davresponse._set_multistatus()
             self.assertTrue(davresponse.is_multistatus)
             self.assertEquals(len(mockparser.called["__call__"]), 1)
@@ -943,7 +1233,7 @@ class WebDAVLockResponseTestCase(unittest.TestCase):
         response.content = MULTISTATUS
         response.status = 409
         lock = WebDAVLockResponse(client, "/", response)
-        self.assertTrue(lock._etree.find("/{DAV:}response") is not None)
+        self.assertEqual(len(lock._entries), 1)
         self.assertTrue(lock.is_multistatus)
 
     def test_repr(self):
@@ -20,6 +20,7 @@
 
 from __future__ import with_statement
 from StringIO import StringIO
+import hashlib
 import unittest
 
 from tinydav import HTTPClient, HTTPError
@@ -213,6 +214,48 @@ class UtilTestCase(unittest.TestCase):
         self.assertRaises(ValueError, util.get_depth, 1, restricted)
         self.assertEqual(util.get_depth("InFiNiTy", restricted), "infinity")
 
+    def test_response_cache(self):
+        """Test util.ResponseCache."""
+        cache = util.ResponseCache(maxsize=2)
+        cache.set(("PROPFIND", "/foo", ""), 1)
+        cache.set(("PROPFIND", "/bar", ""), 2)
+        self.assertEqual(cache.get(("PROPFIND", "/foo", "")), 1)
+        self.assertEqual(cache.get(("PROPFIND", "/missing", "")), None)
+        # exceeding maxsize evicts the least recently used entry: /bar
+        cache.set(("PROPFIND", "/baz", ""), 3)
+        self.assertEqual(cache.get(("PROPFIND", "/bar", "")), None)
+        self.assertEqual(len(cache), 2)
+        # invalidate removes all entries below the given uri
+        cache.invalidate("/baz")
+        self.assertEqual(cache.get(("PROPFIND", "/baz", "")), None)
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_normalize_href(self):
+        """Test util.normalize_href."""
+        self.assertEqual(util.normalize_href("/foo/bar"), "/foo/bar")
+        self.assertEqual(util.normalize_href("/foo/bar/"), "/foo/bar")
+        self.assertEqual(util.normalize_href("/foo%20bar"), "/foo bar")
+        self.assertEqual(
+            util.normalize_href("http://localhost:80/foo/bar/"),
+            "/foo/bar"
+        )
+
+    def test_get_file_size(self):
+        """Test util.get_file_size."""
+        sio = StringIO("This is a test file.")
+        self.assertEqual(util.get_file_size(sio), 20)
+        # the read position is honored and left untouched
+        sio.read(5)
+        self.assertEqual(util.get_file_size(sio), 15)
+        self.assertEqual(sio.tell(), 5)
+        # size of unseekable objects cannot be determined
+        class Unseekable(object):
+            def read(self):
+                return ""
+        self.assertEqual(util.get_file_size(Unseekable()), None)
+
     def test_get_cookie_response(self):
         """Test util.get_cookie_response."""
         response = Mock.Omnivore()
@@ -261,6 +304,44 @@ class UtilTestCase(unittest.TestCase):
         authdata = util.parse_authenticate("Nothing")
         self.assertEqual(authdata, dict())
 
+    def test_digest_creator(self):
+        """Test util.DigestCreator."""
+        challenge = Mock.Omnivore()
+        challenge.realm = "testrealm@host.com"
+        challenge.nonce = "dcd98b7102dd2f0e8b11d0f600bfb0c093"
+        challenge.opaque = "5ccc069c403ebaf9f0171e9517f40e41"
+        challenge.algorithm = hashlib.md5
+        headers = {
+            "Content-Type": "text/plain",
+            "Content-Length": "20",
+            "Date": "Thu, 01 Jan 2009 12:00:00 GMT",
+        }
+        creator = util.DigestCreator(
+            challenge, "Mufasa", "Circle Of Life",
+            "GET", "/dir/index.html",
+            headers, "This is a test file.",
+        )
+        # header lookup is case-insensitive; missing headers are empty
+        self.assertEqual(creator["content-type"], "text/plain")
+        self.assertEqual(creator["EXPIRES"], "")
+        # RFC 2617, 3.2.2.1 Request-Digest (without qop)
+        self.assertEqual(
+            creator.response_digest,
+            "670fd8c2df070c60b045671b8b24ff02"
+        )
+        # H(A1) is computed once and reused
+        self.assertEqual(creator.HA1, "939e7578ed9e3c518a452acee763bce9")
+        self.assertEqual(creator._H_A1, creator.HA1)
+        # RFC 2069, 2.1.2 entity-info and entity-digest
+        self.assertEqual(
+            creator.entity_info,
+            "d1a06066dd3a6758de07eda218cba8c0"
+        )
+        self.assertEqual(
+            creator.entity_digest,
+            "10df4f2c1504addc76d64dcdf98a8795"
+        )
+
     def test_make_multipart(self):
         """Test util.make_multipart."""
         # form-data
@@ -24,35 +24,60 @@ PYTHON2_7 = (sys.version_info >= (2, 7))
 PYTHON2 = ((2, 5) <= sys.version_info <= (3, 0))
 PYTHON3 = (sys.version_info >= (3, 0))
 
-from contextlib import closing
 from email.header import Header
 from functools import wraps, partial
+import socket
+import string
 
 if PYTHON2:
     from httplib import MULTI_STATUS, OK, CONFLICT, NO_CONTENT, UNAUTHORIZED
+    from httplib import NOT_MODIFIED
     from urllib import quote as urllib_quote
     from urllib import urlencode as urllib_urlencode
     from StringIO import StringIO
     import httplib
+    import Queue as queue
 else:
     from http.client import MULTI_STATUS, OK, CONFLICT, NO_CONTENT
-    from http.client import UNAUTHORIZED
+    from http.client import NOT_MODIFIED, UNAUTHORIZED
     from io import BytesIO
-    from io import StringIO
     from urllib.parse import quote as urllib_quote
     from urllib.parse import urlencode as urllib_urlencode
     import base64
     import http.client as httplib
-
-from xml.etree.ElementTree import ElementTree, Element, SubElement, tostring
+    import queue
+    import ssl
+
+try:
+    # C implementation: same API, but much faster parsing
+    from xml.etree.cElementTree import ElementTree, Element, SubElement
+    from xml.etree.cElementTree import fromstring, tostring, iterparse
+except ImportError:
+    # Python 3.9 dropped cElementTree; ElementTree is C-accelerated there
+    from xml.etree.ElementTree import ElementTree, Element, SubElement
+    from xml.etree.ElementTree import fromstring, tostring, iterparse
 
 if PYTHON2_7 or PYTHON3:
-    from xml.etree.ElementTree import ParseError
+    try:
+        # must match the implementation of fromstring/iterparse above:
+        # on Python 2.7 cElementTree raises its own ParseError class
+        from xml.etree.cElementTree import ParseError
+    except ImportError:
+        from xml.etree.ElementTree import ParseError
 else:
     from xml.parsers.expat import ExpatError as ParseError
 
+import binascii
 import hashlib
 
+# Python 3.9 added usedforsecurity; passing False skips the FIPS check
+# per hash construction, which matters on the digest auth hot path
+try:
+    hashlib.md5(b"", usedforsecurity=False)
+    _HASH_USEDFORSECURITY = True
+except (TypeError, ValueError):
+    _HASH_USEDFORSECURITY = False
+
 if PYTHON2:
     import urlparse
 else:
@@ -76,6 +101,12 @@ MAX_TIMEOUT = 2**32-1
 
 ACTIVELOCK = "./{DAV:}lockdiscovery/{DAV:}activelock"
 
+# tag and XPaths evaluated for every entry of a multistatus response
+_XP_RESPONSE = "{DAV:}response"
+_XP_PROPSTAT_STATUS = "{DAV:}propstat/{DAV:}status"
+_XP_PROPSTAT_PROPS = "{DAV:}propstat/{DAV:}prop/*"
+_XP_HREF = "{DAV:}href"
+
 # map with default ports mapped to http protocol
 PROTOCOL = {
     80: "http",
@@ -91,6 +122,134 @@ SCHEME_MAP = {
     "https": ("https", 443),
 }
 
+# RFC 2616, 9.1.2 Idempotent Methods
+# Methods that may safely be repeated on a stale keep-alive connection.
+IDEMPOTENT_METHODS = frozenset([
+    "OPTIONS", "GET", "HEAD", "PUT", "DELETE", "TRACE",
+    "PROPFIND", "PROPPATCH", "MKCOL", "COPY", "MOVE", "UNLOCK", "REPORT",
+])
+
+# methods that change server state and therefore invalidate cached
+# responses for the affected subtree
+INVALIDATING_METHODS = frozenset([
+    "PUT", "POST", "DELETE", "MKCOL", "COPY", "MOVE", "PROPPATCH",
+    "LOCK", "UNLOCK",
+])
+
+# default number of keep-alive connections kept per (protocol, host, port)
+DEFAULT_POOL_SIZE = 8
+
+# PUT bodies up to this size are read into memory and sent in one piece
+# instead of being streamed in 8 kiB blocks
+PUT_COALESCE_LIMIT = 65536
+
+try:
+    _PoolQueue = queue.LifoQueue
+except AttributeError: # Python 2.5
+    _PoolQueue = queue.Queue
+
+# pools with keep-alive connections, shared by all clients talking to the
+# same (protocol, host, port)
+_POOLS = dict()
+
+
+def _getpool(key, size):
+    """Return the connection pool for the given key, creating it if needed.
+
+    key -- 3-tuple (protocol, host, port).
+    size -- Maximum number of pooled connections when the pool is created.
+
+    """
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = _POOLS.setdefault(key, _PoolQueue(size))
+    return pool
+
+
+if PYTHON2:
+    # Python 2's urllib.quote escapes the tilde
+    _SAFE_URI_CHARS = frozenset(string.ascii_letters + string.digits + "/-._")
+else:
+    _SAFE_URI_CHARS = frozenset(string.ascii_letters + string.digits + "/-._~")
+
+# recently quoted uris; unbounded growth is prevented in _quote_uri
+_QUOTE_CACHE = dict()
+_QUOTE_CACHE_SIZE = 128
+
+
+def _quote_uri(uri):
+    """Return the percent-encoded version of uri.
+
+    uri -- The URI to quote.
+
+    Most WebDAV uris consist of safe ASCII path characters only and are
+    returned as they are, skipping urllib's pure Python quoting loop.
+    Recently quoted uris are served from a small cache, which helps tight
+    directory walks that hit the same paths repeatedly.
+
+    """
+    quoted = _QUOTE_CACHE.get(uri)
+    if quoted is None:
+        if all((char in _SAFE_URI_CHARS) for char in uri):
+            quoted = uri
+        else:
+            quoted = urllib_quote(uri)
+        if len(_QUOTE_CACHE) >= _QUOTE_CACHE_SIZE:
+            _QUOTE_CACHE.clear()
+        _QUOTE_CACHE[uri] = quoted
+    return quoted
+
+
+# serialized request bodies keyed by their argument signature; most
+# clients issue only a handful of distinct PROPFIND/REPORT shapes
+_BODY_CACHE = dict()
+_BODY_CACHE_SIZE = 128
+
+
+def _cached_body(key, create, *args):
+    """Return the serialized request body for the given creator call.
+
+    key -- Hashable signature of the body shape.
+    create -- Creator function building the XML string on a cache miss.
+    args -- Arguments for the creator function.
+
+    """
+    body = _BODY_CACHE.get(key)
+    if body is None:
+        if len(_BODY_CACHE) >= _BODY_CACHE_SIZE:
+            _BODY_CACHE.clear()
+        body = _BODY_CACHE.setdefault(key, create(*args))
+    return body
+
+
+_DAV_NS = "{DAV:}"
+_DAV_NS_LEN = len(_DAV_NS)
+
+# text type for header value coercion; unicode went away in Python 3
+_TEXT_TYPE = unicode if PYTHON2 else str
+
+# ready-made XPaths per property name, filled by _prop_xpath; this is in
+# the inner loop when inspecting large multistatus responses
+_PROP_XPATHS = dict()
+
+
+def _prop_xpath(name):
+    """Return the cached property XPath for the given property name.
+
+    name -- Property name including its namespace.
+
+    """
+    xpath = _PROP_XPATHS.get(name)
+    if xpath is None:
+        xpath = _PROP_XPATHS.setdefault(
+            name, "{DAV:}propstat/{DAV:}prop/%s" % name)
+    return xpath
+
+
+# shared by all responses that never parsed a body; replaced wholesale by
+# _parse_xml_content, so sharing one instance is safe
+_EMPTY_ETREE = ElementTree()
+
 
 default_header_encoding = "utf-8"
 separate_query_sequences = True
@@ -106,8 +265,10 @@ class HTTPResponse(int):
     This object has the following attributes:
 
     response -- The original httplib.HTTPResponse object.
-    headers -- A dictionary with the received headers.
-    content -- The content of the response as string.
+    headers -- A dictionary with the received headers, built on first
+               access.
+    content -- The content of the response as string. The content is read
+               from the socket on first access.
     statusline -- The received HTTP status line. E.g. "HTTP/1.1 200 OK".
 
     """
@@ -127,8 +288,9 @@ class HTTPResponse(int):
 
         """
         self.response = response
-        self.headers = dict(response.getheaders())
-        self.content = response.read()
+        self._headers = None
+        self._content = None
+        self._release_callback = None
         version = "HTTP/%s.%s" % tuple(str(response.version))
         self.statusline = "%s %d %s"\
                         % (version, response.status, response.reason)
@@ -146,8 +308,78 @@ class HTTPResponse(int):
         """Return string representation."""
         return self.statusline
 
+    @property
+    def headers(self):
+        """Return a dict with the received headers.
+
+        The dict is built on first access. Use get_header to look up a
+        single header without building the dict.
+
+        """
+        if self._headers is None:
+            self._headers = dict(self.response.getheaders())
+        return self._headers
+
+    def get_header(self, name, default=None):
+        """Return the value of the named response header.
+
+        name -- Case-insensitive name of the header.
+        default -- Value to return when the header was not received.
+
+        The underlying httplib response is asked directly; the header
+        dictionary is not built.
+
+        """
+        value = self.response.getheader(name)
+        if value is None:
+            return default
+        return value
+
+    @property
+    def content(self):
+        """Return the content of the response as string.
+
+        The content is read from the socket on first access and cached.
+        Responses that are only inspected for their status code therefore
+        never buffer their body.
+
+        """
+        if self._content is None:
+            self._content = self.response.read()
+            self._released()
+        return self._content
+
+    def stream(self, chunksize=65536):
+        """Iterate over the response content in chunks of chunksize bytes.
+
+        chunksize -- Number of bytes to read from the socket per iteration.
+
+        The chunks are read directly from the socket, so large responses
+        need not be buffered in memory completely. When content was
+        accessed already, its cached value is yielded as a single chunk.
+
+        """
+        if self._content is not None:
+            yield self._content
+            return
+        while True:
+            data = self.response.read(chunksize)
+            if not data:
+                break
+            yield data
+        # the final empty read has the correct type: str or bytes
+        self._content = self.response.read()
+        self._released()
+
+    def _released(self):
+        """Give the connection back to the issuing client's pool."""
+        callback = self._release_callback
+        if callback is not None:
+            self._release_callback = None
+            callback()
+
     def _setauth(self):
-        value = self.headers.get("www-authenticate", "")
+        value = self.get_header("www-authenticate", "")
         auth = util.parse_authenticate(value)
         for attrname in ("schema", "realm", "domain", "nonce", "opaque"):
             setattr(self, attrname, auth.get(attrname))
@@ -158,7 +390,14 @@ class HTTPResponse(int):
         algorithm = auth.get("algorithm")
         if algorithm is None:
             algorithm = "MD5"
-        self.algorithm = getattr(hashlib, algorithm.lower())
+        # the direct hashlib constructor, not hashlib.new with a string:
+        # md5/sha256 then dispatch straight into the OpenSSL fast path
+        algorithm = getattr(hashlib, algorithm.lower())
+        if _HASH_USEDFORSECURITY:
+            # digest auth hashes per request; it is not a security use in
+            # the FIPS sense, so skip that check on the hot path (3.9+)
+            algorithm = partial(algorithm, usedforsecurity=False)
+        self.algorithm = algorithm
 
 
 class WebDAVResponse(HTTPResponse):
@@ -170,8 +409,10 @@ class WebDAVResponse(HTTPResponse):
     This object has the following attributes:
 
     response -- The original httplib.HTTPResponse object.
-    headers -- A dictionary with the received headers.
-    content -- The content of the response as string.
+    headers -- A dictionary with the received headers, built on first
+               access.
+    content -- The content of the response as string. The content is read
+               from the socket on first access.
     statusline -- The received HTTP status line. E.g. "HTTP/1.1 200 OK".
     is_multistatus -- True, if the response's content is a multi-status
                       response.
@@ -193,7 +434,8 @@ class WebDAVResponse(HTTPResponse):
 
         """
         super(WebDAVResponse, self).__init__(response)
-        self._etree = ElementTree()
+        self._etree = _EMPTY_ETREE
+        self._entries = []
         # on XML parsing error set this to the raised exception
         self.parse_error = None
         self.is_multistatus = False
@@ -209,7 +451,7 @@ class WebDAVResponse(HTTPResponse):
         if self.is_multistatus:
             # RFC 2518, 12.9 multistatus XML Element
             # <!ELEMENT multistatus (response+, responsedescription?) >
-            return len(self._etree.findall("./{DAV:}response"))
+            return len(self._entries)
         return 1
 
     def __iter__(self):
@@ -223,16 +465,23 @@ class WebDAVResponse(HTTPResponse):
         if self.is_multistatus:
             # RFC 2518, 12.9 multistatus XML Element
             # <!ELEMENT multistatus (response+, responsedescription?) >
-            for response in self._etree.findall("./{DAV:}response"):
-                yield MultiStatusResponse(response)
+            for entry in self._entries:
+                yield MultiStatusResponse._from_entry(entry)
         else:
             yield self
 
-    def _parse_xml_content(self):
-        """Parse the XML content.
+    def _parse_multistatus(self):
+        """Parse the multistatus content incrementally.
 
-        If the response content cannot be parsed as XML content, 
-        <root><empty/></root> will be taken as content instead.
+        The status line, href and property elements of each
+        {DAV:}response are extracted into one _MSEntry per response while
+        iterparse delivers the elements. The elements themselves are
+        cleared afterwards, so only the property subtrees stay
+        referenced; the rest of the tree is left to the garbage
+        collector.
+
+        If the content cannot be parsed as XML, self._entries stays
+        empty and self.parse_error is set.
 
         """
         try:
@@ -240,18 +489,47 @@ class WebDAVResponse(HTTPResponse):
                 parse_me = StringIO(self.content)
             else:
                 parse_me = BytesIO(self.content)
-            self._etree.parse(parse_me)
+            # RFC 2518, 12.9.1 response XML Element
+            # <!ELEMENT response (href, ((href*, status)|(propstat+)),
+            # responsedescription?) >
+            for (event, elem) in iterparse(parse_me):
+                if elem.tag != _XP_RESPONSE:
+                    continue
+                statusline = elem.findtext(_XP_PROPSTAT_STATUS)
+                href = elem.findtext(_XP_HREF)
+                props = dict()
+                for prop in elem.findall(_XP_PROPSTAT_PROPS):
+                    props[prop.tag] = prop
+                self._entries.append(_MSEntry(statusline, href, props))
+                elem.clear()
+        except ParseError:
+            # get the exception object this way to be compatible with Python
+            # versions 2.5 up to 3.x
+            self.parse_error = sys.exc_info()[1]
+            # don't fail on further processing
+            del self._entries[:]
+
+    def _parse_xml_content(self):
+        """Parse the XML content.
+
+        If the response content cannot be parsed as XML content, 
+        <root><empty/></root> will be taken as content instead.
+
+        """
+        try:
+            root = fromstring(self.content)
         except ParseError:
             # get the exception object this way to be compatible with Python
             # versions 2.5 up to 3.x
             self.parse_error = sys.exc_info()[1]
             # don't fail on further processing
-            self._etree.parse(StringIO("<root><empty/></root>"))
+            root = fromstring("<root><empty/></root>")
+        self._etree = ElementTree(root)
 
     def _set_multistatus(self):
         """Set this response to a multistatus response."""
         self.is_multistatus = True
-        self._parse_xml_content()
+        self._parse_multistatus()
 
 
 class WebDAVLockResponse(WebDAVResponse):
@@ -264,8 +542,10 @@ class WebDAVLockResponse(WebDAVResponse):
     This object has the following attributes:
 
     response -- The original httplib.HTTPResponse object.
-    headers -- A dictionary with the received headers.
-    content -- The content of the response as string.
+    headers -- A dictionary with the received headers, built on first
+               access.
+    content -- The content of the response as string. The content is read
+               from the socket on first access.
     statusline -- The received HTTP status line. E.g. "HTTP/1.1 200 OK".
     is_multistatus -- True, if the response's content is a multi-status
                       response.
@@ -457,6 +737,29 @@ class WebDAVLockResponse(WebDAVResponse):
         return self._locktokens
 
 
+class _MSEntry(object):
+    """Pre-extracted data of one {DAV:}response element.
+
+    The status line, href and properties are pulled out of the XML once
+    at parse time, so iterating a multistatus response does not walk the
+    tree again per access.
+
+    """
+    __slots__ = ("statusline", "href", "props")
+
+    def __init__(self, statusline, href, props):
+        """Initialize the entry.
+
+        statusline -- The status line of the response entry.
+        href -- The href text of the response entry.
+        props -- Dict mapping property names to ElementTree elements.
+
+        """
+        self.statusline = statusline
+        self.href = href
+        self.props = props
+
+
 class MultiStatusResponse(int):
     """Wrapper for multistatus responses.
 
@@ -479,9 +782,13 @@ class MultiStatusResponse(int):
         # RFC 2518, 12.9.1 response XML Element
         # <!ELEMENT response (href, ((href*, status)|(propstat+)),
         # responsedescription?) >
-        statusline = response.findtext("{DAV:}propstat/{DAV:}status")
+        statusline = response.findtext(_XP_PROPSTAT_STATUS)
         status = int(statusline.split()[1])
-        return int.__new__(cls, status)
+        self = int.__new__(cls, status)
+        # keep the status line found above; the statusline property would
+        # otherwise traverse the same XPath a second time
+        self._statusline = statusline
+        return self
 
     def __init__(self, response):
         """Initialize the MultiStatusResponse.
@@ -491,8 +798,26 @@ class MultiStatusResponse(int):
         """
         self.response = response
         self._href = None
-        self._statusline = None
         self._namespaces = None
+        self._props = None
+
+    @classmethod
+    def _from_entry(cls, entry):
+        """Construct a MultiStatusResponse from a parsed _MSEntry.
+
+        entry -- _MSEntry with the pre-extracted response data.
+
+        The properties are read from the entry's dict; no XML tree is
+        walked on attribute access.
+
+        """
+        self = int.__new__(cls, int(entry.statusline.split()[1]))
+        self.response = None
+        self._href = entry.href
+        self._statusline = entry.statusline
+        self._namespaces = None
+        self._props = entry.props
+        return self
 
     def __repr__(self):
         """Return representation string."""
@@ -507,10 +832,13 @@ class MultiStatusResponse(int):
         """
         # check, whether it's a default DAV property name
         if not name.startswith("{"):
-            name = "{DAV:}%s" % name
-        # RFC 2518, 12.9.1.1 propstat XML Element
-        # <!ELEMENT propstat (prop, status, responsedescription?) >
-        prop = self.response.find("{DAV:}propstat/{DAV:}prop/%s" % name)
+            name = _DAV_NS + name
+        if self._props is not None:
+            prop = self._props.get(name)
+        else:
+            # RFC 2518, 12.9.1.1 propstat XML Element
+            # <!ELEMENT propstat (prop, status, responsedescription?) >
+            prop = self.response.find(_prop_xpath(name))
         if prop is None:
             raise KeyError(name)
         return prop
@@ -563,11 +891,19 @@ class MultiStatusResponse(int):
         """
         # RFC 2518, 12.11 prop XML element
         # <!ELEMENT prop ANY>
-        props = self.response.findall("{DAV:}propstat/{DAV:}prop/*")
+        if self._props is not None:
+            props_iterator = (self._props.iteritems() if PYTHON2
+                              else self._props.items())
+            for (tagname, prop) in props_iterator:
+                if cut_dav_ns and (tagname[:_DAV_NS_LEN] == _DAV_NS):
+                    tagname = tagname[_DAV_NS_LEN:]
+                yield (tagname, prop)
+            return
+        props = self.response.findall(_XP_PROPSTAT_PROPS)
         for prop in props:
             tagname = prop.tag
-            if cut_dav_ns and tagname.startswith("{DAV:}"):
-                tagname = tagname[6:]
+            if cut_dav_ns and (tagname[:_DAV_NS_LEN] == _DAV_NS):
+                tagname = tagname[_DAV_NS_LEN:]
             yield (tagname, prop)
 
     if PYTHON3:
@@ -598,7 +934,7 @@ class MultiStatusResponse(int):
         if self._statusline is None:
             # RFC 2518, 12.9.1.2 status XML Element
             # <!ELEMENT status (#PCDATA) >
-            statustag = self.response.findtext("{DAV:}propstat/{DAV:}status")
+            statustag = self.response.findtext(_XP_PROPSTAT_STATUS)
             self._statusline = statustag
         return self._statusline
 
@@ -608,7 +944,7 @@ class MultiStatusResponse(int):
         if self._href is None:
             # RFC 2518, 12.3 href XML Element
             # <!ELEMENT href (#PCDATA)>
-            self._href = self.response.findtext("{DAV:}href")
+            self._href = self.response.findtext(_XP_HREF)
         return self._href
 
     if PYTHON2:
@@ -664,7 +1000,8 @@ class HTTPClient(object):
         return self
 
     def __init__(self, host, port=80, protocol=None, strict=False,
-                 timeout=None, source_address=None):
+                 timeout=None, source_address=None,
+                 pool_size=DEFAULT_POOL_SIZE):
         """Initialize the WebDAV client.
 
         host -- WebDAV server host.
@@ -689,6 +1026,9 @@ class HTTPClient(object):
                           httplib). This argument is available since
                           Python 2.7. It won't have any effect in previous
                           versions.
+        pool_size -- Maximum number of keep-alive connections to pool for
+                     this client's (protocol, host, port). The pool is
+                     shared with other clients talking to the same server.
 
         """
         assert isinstance(port, int)
@@ -710,11 +1050,14 @@ class HTTPClient(object):
         self.headers = dict()
         self.cookie = None
         self._do_digest_auth = False
+        self.pool_size = pool_size
 
     def _getconnection(self):
-        """Return HTTP(S)Connection object depending on set protocol."""
+        """Return new HTTP(S)Connection object depending on set protocol."""
         args = (self.host, self.port,)
-        kwargs = dict(strict=self.strict)
+        # Python 3.4 dropped the strict argument; the old lenient mode is
+        # simply gone there
+        kwargs = dict(strict=self.strict) if PYTHON2 else dict()
         if PYTHON2_6:
             kwargs["timeout"] = self.timeout
         if PYTHON2_7:
@@ -726,9 +1069,64 @@ class HTTPClient(object):
             kwargs["key_file"] = self.key_file
             kwargs["cert_file"] = self.cert_file
         else:
+            if self.context is None:
+                # Share one context per client: without it every
+                # HTTPSConnection builds its own default context and
+                # performs a full TLS handshake. A shared context keeps
+                # the session cache, so pooled reconnects are resumed.
+                self.context = ssl.create_default_context()
             kwargs["context"] = self.context
         return httplib.HTTPSConnection(*args, **kwargs)
 
+    def _getresponse(self, con):
+        """Return the connection's response, with buffered reads if possible.
+
+        Python 2.7's httplib reads the response unbuffered unless
+        buffering=True is given, causing one recv per header byte.
+        Python 3 always buffers and dropped the argument.
+
+        """
+        if PYTHON2 and PYTHON2_7:
+            return con.getresponse(buffering=True)
+        return con.getresponse()
+
+    def _acquire(self):
+        """Return a pooled keep-alive connection or create a new one."""
+        pool = _getpool((self.protocol, self.host, self.port), self.pool_size)
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            return self._getconnection()
+
+    def _release(self, con, keep):
+        """Put a connection back into the pool or close it.
+
+        con -- The HTTP(S)Connection object to release.
+        keep -- True, if the connection may be reused for further requests.
+
+        """
+        if keep:
+            pool = _getpool((self.protocol, self.host, self.port),
+                            self.pool_size)
+            try:
+                pool.put_nowait(con)
+                return
+            except queue.Full:
+                pass
+        con.close()
+
+    def close(self):
+        """Close all pooled connections for this client's server."""
+        pool = _POOLS.get((self.protocol, self.host, self.port))
+        if pool is None:
+            return
+        while True:
+            try:
+                con = pool.get_nowait()
+            except queue.Empty:
+                break
+            con.close()
+
     def _request(self, method, uri, content=None, headers=None):
         """Make request and return response.
 
@@ -748,14 +1146,47 @@ class HTTPClient(object):
             fake_request = util.FakeHTTPRequest(self, uri, headers)
             self.cookie.add_cookie_header(fake_request)
 
-        con = self._getconnection()
-        with closing(con):
+        con = self._acquire()
+        try:
             con.request(method, uri, content, headers)
-            response = self.ResponseType(con.getresponse())
-            if 400 <= response < 500:
-                response = HTTPUserError(response)
-            elif 500 <= response < 600:
-                response = HTTPServerError(response)
+            response = self.ResponseType(self._getresponse(con))
+        except (httplib.BadStatusLine, socket.error):
+            # The pooled keep-alive connection went stale. Reconnect and
+            # retry once, but only for methods that may safely be repeated.
+            con.close()
+            if method not in IDEMPOTENT_METHODS:
+                raise
+            con = self._getconnection()
+            con.request(method, uri, content, headers)
+            response = self.ResponseType(self._getresponse(con))
+        # put the connection back into the pool unless the server announced
+        # it is going to close it
+        connection = response.get_header("connection", "")
+        keep = (connection.lower() != "close")
+        # the connection may only be reused after the response body was
+        # read off the socket completely; responses that cannot carry a
+        # body leave nothing on the socket, but httplib reports them as
+        # open until read is called, so check for them explicitly
+        # RFC 2616, 4.3 Message Body
+        bodyless = (
+            (response < OK)                     # 1xx
+            or (response == NO_CONTENT)
+            or (response == NOT_MODIFIED)
+            or (method == "HEAD")
+            or (response.get_header("content-length", "") == "0")
+        )
+        if bodyless or response.response.isclosed():
+            self._release(con, keep)
+        else:
+            response._release_callback = partial(self._release, con, keep)
+        if 400 <= response < 600:
+            # fetch the error body now: callers expect it on the raised
+            # error and reading it frees the connection for reuse
+            response.content
+        if 400 <= response < 500:
+            response = HTTPUserError(response)
+        elif 500 <= response < 600:
+            response = HTTPServerError(response)
 
         if self.cookie is not None:
             # Get response object suitable for cookielib
@@ -779,17 +1210,23 @@ class HTTPClient(object):
         query -- Mapping with key/value-pairs to be added as query to the URI.
 
         """
-        uri = urllib_quote(uri)
+        uri = _quote_uri(uri)
         # collect headers
         sendheaders = dict(self.headers)
         if headers:
             sendheaders.update(headers)
         for (key, value) in sendheaders.items():
             try:
-                unicode(value).encode("ascii")
+                _TEXT_TYPE(value).encode("ascii")
             except UnicodeError:
-                value = str(Header(value, default_header_encoding))
+                # Header.encode returns the MIME encoded word on both
+                # Python lines; str(Header) stopped doing so on Python 3
+                value = Header(value, default_header_encoding).encode()
             sendheaders[key] = value
+        # RFC 2068, 19.7.1 Compatibility with HTTP/1.0 Persistent Connections
+        # Clients are also encouraged to consider the use of Connection:
+        # keep-alive in requests.
+        sendheaders.setdefault("Connection", "keep-alive")
         # construct query string
         if query:
             querystr = urllib_urlencode(query, doseq=separate_query_sequences)
@@ -812,7 +1249,9 @@ class HTTPClient(object):
             # userid      = *<TEXT excluding ":">
             # password    = *TEXT
             userpw = "%s:%s" % (user, password)
-            auth = userpw.encode("base64").rstrip()
+            # b2a_base64 is a direct C call; the base64 codec goes through
+            # the codec registry and inserts a newline every 76 chars
+            auth = binascii.b2a_base64(userpw).rstrip()
             self.headers["Authorization"] = "Basic %s" % auth
     else:
         def setbasicauth(self, user, password,
@@ -975,6 +1414,13 @@ class HTTPClient(object):
         headers["content-type"] = content_type
         # use 2.6 feature, if running under this version
         data = fileobject if PYTHON2_6 else fileobject.read()
+        if hasattr(data, "read"):
+            size = util.get_file_size(data)
+            if (size is not None) and (size <= PUT_COALESCE_LIMIT):
+                # coalesce small bodies into a single string: httplib then
+                # sends them in one go instead of one send per 8 kiB block
+                headers["Content-Length"] = str(size)
+                data = data.read()
         return self._request("PUT", uri, data, headers)
 
     def delete(self, uri, content="", headers=None):
@@ -1044,6 +1490,8 @@ class CoreWebDAVClient(HTTPClient):
     headers -- Dictionary with headers to send with every request.
     cookie -- If set with setcookie: the given object.
     locks -- Dictionary containing all active locks, mapped by tag -> Lock.
+    cache -- util.ResponseCache with revalidatable responses. Set to None
+             to disable caching.
 
     """
 
@@ -1066,6 +1514,55 @@ class CoreWebDAVClient(HTTPClient):
         """
         super(CoreWebDAVClient, self).__init__(host, port, protocol)
         self.locks = dict()
+        self.cache = util.ResponseCache()
+
+    def _request(self, method, uri, content=None, headers=None):
+        """Make request and return response.
+
+        Requests that change server state invalidate the cached responses
+        for the affected subtree. See HTTPClient._request.
+
+        """
+        if (self.cache is not None) and (method in INVALIDATING_METHODS):
+            self.cache.invalidate(uri)
+        return super(CoreWebDAVClient, self)._request(method, uri,
+                                                      content, headers)
+
+    def _cached_request(self, method, uri, content, headers):
+        """Make request, revalidating against the response cache.
+
+        Responses carrying an ETag are cached. On the next identical
+        request the recorded ETag is sent as If-None-Match; a 304 (Not
+        Modified) answer is then served from the cache without
+        transferring or parsing the body again.
+
+        method -- Request method.
+        uri -- Prepared URI the request is for.
+        content -- The content of the request. May be None.
+        headers -- Prepared mapping with headers to send.
+
+        """
+        if self.cache is None:
+            return self._request(method, uri, content, headers)
+        # the Depth header changes the response body and belongs into
+        # the key, else a depth-1 request would revalidate against a
+        # cached depth-0 multistatus
+        key = (method, uri, headers.get("Depth"), content)
+        cached = self.cache.get(key)
+        if cached is not None:
+            etag = cached.get_header("etag")
+            if etag:
+                # RFC 2616, 14.26 If-None-Match
+                headers["If-None-Match"] = etag
+        response = self._request(method, uri, content, headers)
+        if response == NOT_MODIFIED:
+            # served from the cache; a 304 to a caller-supplied
+            # If-None-Match has no body worth caching either
+            if cached is not None:
+                return cached
+        elif response.get_header("etag"):
+            self.cache.set(key, response)
+        return response
 
     def _preparecopymove(self, source, destination, depth, overwrite, headers):
         """Return prepared for copy/move request version of uri and headers."""
@@ -1147,9 +1644,70 @@ class CoreWebDAVClient(HTTPClient):
         # additional headers needed for PROPFIND
         headers["Depth"] = depth
         headers["Content-Type"] = "application/xml"
-        content = creator.create_propfind(names, properties,
-                                          include, namespaces)
-        return self._request("PROPFIND", uri, content, headers)
+        # materialize iterable arguments once: they have to feed both the
+        # cache key and the creator
+        properties = tuple(properties) if properties else None
+        include = tuple(include) if include else None
+        key = ("propfind", names, properties, include,
+               tuple(sorted(namespaces.items())) if namespaces else None)
+        content = _cached_body(key, creator.create_propfind,
+                               names, properties, include, namespaces)
+        return self._cached_request("PROPFIND", uri, content, headers)
+
+    def propfind_many(self, uris, names=False, properties=None,
+                      include=None, namespaces=None, headers=None):
+        """Make PROPFIND requests for several uris and return a dict.
+
+        uris -- Iterable with paths to get properties for.
+        names -- If True, only the available namespace names are returned.
+        properties -- If given, an iterable with all requested properties is
+                      expected.
+        include -- If properties is not given, then additional properties can
+                   be requested with this argument.
+        namespaces -- Mapping with namespaces for given properties, if needed.
+        headers -- If given, must be a dict with headers to send.
+
+        Sibling uris are grouped under their parent collection and fetched
+        with a single Depth: 1 PROPFIND whose multistatus response is
+        demultiplexed, saving one round-trip per sibling. Uris without
+        siblings are fetched with a Depth: 0 PROPFIND each.
+
+        Return a dict mapping each given uri to its MultiStatusResponse or
+        to None, when the server sent no response for that uri.
+
+        Raise ValueError, if properties and include arguments were given.
+        Raise HTTPUserError on 4xx HTTP status codes.
+        Raise HTTPServerError on 5xx HTTP status codes.
+
+        """
+        uris = list(uris)
+        # materialize once: the same iterables feed one propfind per group
+        properties = tuple(properties) if properties else None
+        include = tuple(include) if include else None
+        result = dict((uri, None) for uri in uris)
+        # group the uris by their parent collection
+        groups = dict()
+        for uri in uris:
+            parent = "%s/" % uri.rstrip("/").rpartition("/")[0]
+            groups.setdefault(parent, list()).append(uri)
+        groups_iterator = groups.iteritems() if PYTHON2 else groups.items()
+        for (parent, children) in groups_iterator:
+            if len(children) == 1:
+                # a single uri is cheaper to fetch directly
+                (request_uri, depth) = (children[0], 0)
+            else:
+                (request_uri, depth) = (parent, 1)
+            response = self.propfind(request_uri, depth, names, properties,
+                                     include, namespaces, headers)
+            wanted = dict((util.normalize_href(uri), uri) for uri in children)
+            for subresponse in response:
+                href = getattr(subresponse, "href", None)
+                if href is None:
+                    continue
+                uri = wanted.get(util.normalize_href(href))
+                if uri is not None:
+                    result[uri] = subresponse
+        return result
 
     def proppatch(self, uri, setprops=None, delprops=None,
                   namespaces=None, headers=None):
@@ -1174,7 +1732,21 @@ class CoreWebDAVClient(HTTPClient):
         (uri, headers) = self._prepare(uri, headers)
         # additional header for proppatch
         headers["Content-Type"] = "application/xml"
-        content = creator.create_proppatch(setprops, delprops, namespaces)
+        # materialize once: delprops may be an iterator and has to feed
+        # both the cache key and the creator
+        delprops = tuple(delprops) if delprops else None
+        # clients tend to patch the same few properties over and over;
+        # reuse the serialized body for repeated shapes
+        key = ("proppatch",
+               tuple(sorted(setprops.items())) if setprops else None,
+               delprops,
+               tuple(sorted(namespaces.items())) if namespaces else None)
+        try:
+            content = _cached_body(key, creator.create_proppatch,
+                                   setprops, delprops, namespaces)
+        except TypeError:
+            # unhashable property values: build the body as usual
+            content = creator.create_proppatch(setprops, delprops, namespaces)
         return self._request("PROPPATCH", uri, content, headers)
 
     def delete(self, uri, headers=None):
@@ -1212,6 +1784,9 @@ class CoreWebDAVClient(HTTPClient):
         """
         (source, headers) = self._preparecopymove(source, destination, depth,
                                                   overwrite, headers)
+        if self.cache is not None:
+            # the destination subtree is changed as well
+            self.cache.invalidate(urllib_quote(destination))
         return self._request("COPY", source, None, headers)
 
     def move(self, source, destination, depth="infinity",
@@ -1237,6 +1812,9 @@ class CoreWebDAVClient(HTTPClient):
             raise ValueError("depth must be infinity when moving collections")
         (source, headers) = self._preparecopymove(source, destination, depth,
                                                   overwrite, headers)
+        if self.cache is not None:
+            # the destination subtree is changed as well
+            self.cache.invalidate(urllib_quote(destination))
         return self._request("MOVE", source, None, headers)
 
     def lock(self, uri, scope="exclusive", type_="write", owner=None,
@@ -1282,7 +1860,13 @@ class CoreWebDAVClient(HTTPClient):
         # method.
         if depth is not None:
             headers["Depth"] = util.get_depth(depth, ("0", "infinity"))
-        content = creator.create_lock(scope, type_, owner)
+        if (owner is None) or isinstance(owner, creator.STRING_TYPE):
+            # the usual shapes are byte-identical per (scope, type, owner)
+            content = _cached_body(("lock", scope, type_, owner),
+                                   creator.create_lock, scope, type_, owner)
+        else:
+            # owner may be an ElementTree element: not hashable, build fresh
+            content = creator.create_lock(scope, type_, owner)
         # set a specialized ResponseType as instance var
         self.ResponseType = partial(WebDAVLockResponse, self, uri)
         try:
@@ -1367,8 +1951,17 @@ class ExtendedWebDAVClient(CoreWebDAVClient):
         Raise HTTPServerError on 5xx HTTP status codes.
 
         """
-        args = (properties, elements, namespaces)
-        content = creator.create_report_version_tree(*args)
+        # materialize once: the cache key and the creator share the tuple
+        properties = tuple(properties) if properties else None
+        if elements:
+            # extra elements cannot be used as cache key
+            content = creator.create_report_version_tree(properties, elements,
+                                                         namespaces)
+        else:
+            key = ("version-tree", properties,
+                   tuple(sorted(namespaces.items())) if namespaces else None)
+            content = _cached_body(key, creator.create_report_version_tree,
+                                   properties, None, namespaces)
         return self.__report(uri, depth, content, headers)
 
     # compatibility
@@ -19,10 +19,21 @@
 from collections import defaultdict
 
 try:
-    from collections import Mapping
+    from collections.abc import Mapping
 except ImportError:
-    Mapping = (dict, defaultdict)
+    try:
+        # moved to collections.abc in Python 3.3, removed from
+        # collections in 3.10
+        from collections import Mapping
+    except ImportError:
+        # Python 2.5 predates the ABCs
+        Mapping = (dict, defaultdict)
+# not cElementTree: callers hand in elements built with the pure-Python
+# ElementTree (create_lock owner, the report creators' elements) and
+# cElementTree's append rejects those on Python 2; on Python 3 this
+# module is C-accelerated anyway
 from xml.etree.ElementTree import Element, SubElement, tostring
+from xml.sax.saxutils import escape, quoteattr
 import sys
 
 PYTHON2 = ((2, 5) <= sys.version_info <= (3, 0))
@@ -30,6 +41,29 @@ PYTHON2_6 = (sys.version_info >= (2, 6))
 STRING_TYPE = basestring if PYTHON2 else str
 _NS = {"xmlns": "DAV:"}
 
+# serialized lockinfo skeleton; filled with (scope, type_)
+_LOCKINFO = ('<lockinfo xmlns="DAV:">'
+             '<lockscope><%s /></lockscope>'
+             '<locktype><%s /></locktype>')
+
+# RFC 2518, 12.7 lockscope XML Element
+# <!ELEMENT lockscope (exclusive | shared) >
+_LOCK_SCOPES = frozenset(("exclusive", "shared"))
+
+
+def _escape(text):
+    """Return text with the XML special characters escaped.
+
+    text -- String to escape.
+
+    Most values contain no specials at all; those are returned as-is
+    without the three replace passes saxutils.escape would run.
+
+    """
+    if ("&" in text) or ("<" in text) or (">" in text):
+        return escape(text)
+    return text
+
 
 def _addnamespaces(elem, namespaces):
     """Add namespace definitions to a given XML element.
@@ -39,9 +73,26 @@ def _addnamespaces(elem, namespaces):
                   if necessary.
 
     """
-    for nsname in namespaces:
-        attrname = "xmlns:%s" % nsname
-        elem.attrib[attrname] = namespaces[nsname]
+    items_iterator = namespaces.iteritems() if PYTHON2 else namespaces.items()
+    elem.attrib.update(dict(("xmlns:%s" % nsname, uri)
+                            for (nsname, uri) in items_iterator))
+
+
+def _propfind_document(names):
+    """Return the serialized fixed-shape PROPFIND document.
+
+    names -- When True build the propname document, else allprop.
+
+    """
+    propfind = Element("propfind", _NS)
+    SubElement(propfind, "propname" if names else "allprop")
+    return tostring(propfind, "UTF-8")
+
+
+# the two fixed-shape PROPFIND documents never change; serializing them
+# once at import keeps the bytes identical to what tostring emits
+_PROPFIND_NAMES = _propfind_document(True)
+_PROPFIND_ALLPROP = _propfind_document(False)
 
 
 def create_propfind(names=False, properties=None,
@@ -61,11 +112,17 @@ def create_propfind(names=False, properties=None,
     request is created.
 
     """
-    namespaces = dict() if (namespaces is None) else namespaces
+    if not namespaces:
+        # the documents for these shapes are prebuilt
+        if names:
+            return _PROPFIND_NAMES
+        if not (properties or include):
+            return _PROPFIND_ALLPROP
     # RFC 2518, 12.14 propfind XML Element
     # <!ELEMENT propfind (allprop | propname | prop) >
     propfind = Element("propfind", _NS)
-    _addnamespaces(propfind, namespaces)
+    if namespaces:
+        _addnamespaces(propfind, namespaces)
     if names:
         # RFC 2518, 12.14.2 propname XML Element
         # <!ELEMENT propname EMPTY >
@@ -99,28 +156,44 @@ def create_proppatch(setprops, delprops, namespaces=None):
                   if necessary.
 
     """
+    # the document is a flat sequence of known elements: assembling the
+    # fragments directly skips the tree construction and serialization;
+    # this also makes the set properties siblings, where the former tree
+    # building nested each property into the previous one
+    parts = ['<propertyupdate xmlns="DAV:"']
+    if namespaces:
+        for nsname in sorted(namespaces):
+            # quoteattr escapes and quotes the uri for attribute position
+            parts.append(" xmlns:%s=%s"
+                         % (nsname, quoteattr(namespaces[nsname])))
+    parts.append(">")
     # RFC 2518, 12.13 propertyupdate XML element
     # <!ELEMENT propertyupdate (remove | set)+ >
-    propertyupdate = Element("propertyupdate", _NS)
-    if namespaces:
-        _addnamespaces(propertyupdate, namespaces)
     # RFC 2518, 12.13.2 set XML element
     # <!ELEMENT set (prop) >
     if setprops:
-        set_ = SubElement(propertyupdate, "set")
-        prop = SubElement(set_, "prop")
-        items_iterator = setprops.iteritems() if PYTHON2 else setprops.items()
-        for (propname, propvalue) in items_iterator:
-            prop = SubElement(prop, propname)
-            prop.text = propvalue
+        parts.append("<set><prop>")
+        for propname in sorted(setprops):
+            propvalue = setprops[propname]
+            if propvalue:
+                parts.append("<%s>%s</%s>"
+                             % (propname, _escape(propvalue), propname))
+            else:
+                parts.append("<%s />" % propname)
+        parts.append("</prop></set>")
     # RFC 2518, 12.13.1 set XML element
     # <!ELEMENT remove (prop) >
     if delprops:
-        remove = SubElement(propertyupdate, "remove")
-        prop = SubElement(remove, "prop")
+        parts.append("<remove><prop>")
         for propname in delprops:
-            prop = SubElement(prop, propname)
-    return tostring(propertyupdate, "UTF-8")
+            parts.append("<%s />" % propname)
+        parts.append("</prop></remove>")
+    parts.append("</propertyupdate>")
+    xml = "".join(parts)
+    if PYTHON2:
+        # tostring with an explicit encoding prepends the declaration here
+        return "<?xml version='1.0' encoding='UTF-8'?>\n" + xml
+    return xml.encode("utf-8")
 
 
 def create_lock(scope="exclusive", type_="write", owner=None):
@@ -139,10 +212,25 @@ def create_lock(scope="exclusive", type_="write", owner=None):
     # <!ELEMENT exclusive EMPTY >
     # RFC 2518, 12.7.2 shared XML Element
     # <!ELEMENT shared EMPTY >
-    if scope not in ("exclusive", "shared"):
+    if scope not in _LOCK_SCOPES:
         raise ValueError("scope must be either exclusive or shared")
     # RFC 2518, 12.6 lockinfo XML Element
     # <!ELEMENT lockinfo (lockscope, locktype, owner?) >
+    if (not PYTHON2) and isinstance(owner, bytes):
+        # on Python 2 bytes is str and takes the string path anyway
+        owner = owner.decode("utf-8")
+    if (owner is None) or isinstance(owner, STRING_TYPE):
+        # the document shape is fixed: filling in the template skips the
+        # tree construction and serialization entirely
+        parts = [_LOCKINFO % (scope, type_)]
+        if owner is not None:
+            # RFC 2518, 12.10 owner XML Element
+            # <!ELEMENT owner ANY>
+            parts.append("<owner>%s</owner>" % _escape(owner))
+        parts.append("</lockinfo>")
+        xml = "".join(parts)
+        return xml if PYTHON2 else xml.encode("utf-8")
+    # owner is an XML element: build and serialize the tree
     lockinfo = Element("lockinfo", _NS)
     # set lockscope
     lockscope = SubElement(lockinfo, "lockscope")
@@ -153,27 +241,23 @@ def create_lock(scope="exclusive", type_="write", owner=None):
     # <!ELEMENT write EMPTY >
     locktype = SubElement(lockinfo, "locktype")
     typ_ = SubElement(locktype, type_)
-    if owner is not None:
-        # RFC 2518, 12.10 owner XML Element
-        # <!ELEMENT owner ANY>
-        owner_elem = SubElement(lockinfo, "owner")
-        if isinstance(owner, STRING_TYPE):
-            owner_elem.text = owner
-        else:
-            owner_elem.append(owner)
+    # RFC 2518, 12.10 owner XML Element
+    # <!ELEMENT owner ANY>
+    owner_elem = SubElement(lockinfo, "owner")
+    owner_elem.append(owner)
     return tostring(lockinfo)
 
 
 def create_report_version_tree(properties=None, elements=None, namespaces=None):
     """Construct and return XML for REPORT."""
-    namespaces = dict() if (namespaces is None) else namespaces
-    ns = {"xmlns": "DAV:"}
     # RFC 3253, 3.7 DAV:version-tree Report
     # <!ELEMENT version-tree ANY>
     # ANY value: a sequence of zero or more elements, with at most one
     # DAV:prop element.
-    report = Element("version-tree", ns)
-    _addnamespaces(report, namespaces)
+    # ElementTree copies the attributes, so the module constant is safe
+    report = Element("version-tree", _NS)
+    if namespaces:
+        _addnamespaces(report, namespaces)
     if properties:
         prop = SubElement(report, "prop")
         for propname in properties:
@@ -187,15 +271,14 @@ def create_report_version_tree(properties=None, elements=None, namespaces=None):
 def create_report_expand_property(properties=None, elements=None,
                                   namespaces=None):
     """Construct and return XML for expand-property-REPORT."""
-    namespaces = dict() if (namespaces is None) else namespaces
-    ns = {"xmlns": "DAV:"}
     # RFC 3253, 3.8 DAV:expand-property Report
     # <!ELEMENT expand-property (property*)>
     # <!ELEMENT property (property*)>
     # <!ATTLIST property name NMTOKEN #REQUIRED>
     # name value: a property element type
-    report = Element("expand-property", ns)
-    _addnamespaces(report, namespaces)
+    report = Element("expand-property", _NS)
+    if namespaces:
+        _addnamespaces(report, namespaces)
 
     def attach_properties(elem, properties):
         """Attach property-Elements to given element recursivly.
@@ -204,7 +287,7 @@ def create_report_expand_property(properties=None, elements=None,
         properties -- string, list or mapping with element-names to attach.
 
         """
-        if isinstance(properties, basestring):
+        if isinstance(properties, STRING_TYPE):
             properties = {properties: None}
         elif not isinstance(properties, Mapping):
             properties = dict.fromkeys(properties, None)
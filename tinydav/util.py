@@ -19,24 +19,28 @@
 import sys
 PYTHON2 = ((2, 5) <= sys.version_info <= (3, 0))
 
-from email.encoders import encode_base64
-from email.mime.application import MIMEApplication
+from email.base64mime import body_encode
+from email.generator import Generator
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from os import path
+from os import fstat, path
 import re
 
 if PYTHON2:
-    from urlparse import urlunsplit
+    from StringIO import StringIO
+    from urllib import unquote
+    from urlparse import urlsplit
 else:
-    from urllib.parse import urlunsplit
+    from io import StringIO
+    from urllib.parse import unquote, urlsplit
 
 from tinydav.exception import HTTPError
 
 __all__ = (
-    "FakeHTTPRequest", "make_absolute", "make_multipart",
-    "extract_namespace", "get_depth"
+    "DigestCreator", "FakeHTTPRequest", "make_absolute", "make_multipart",
+    "extract_namespace", "get_depth", "get_file_size", "normalize_href",
+    "ResponseCache"
 )
 
 authparser = re.compile("""
@@ -61,6 +65,10 @@ class FakeHTTPRequest(object):
     See http://docs.python.org/library/cookielib.html#cookiejar-and-filecookiejar-objects
 
     """
+    # one instance per request: a fixed slot layout is enough and
+    # saves the per-instance dict
+    __slots__ = ("_client", "_uri", "_headers")
+
     def __init__(self, client, uri, headers):
         """Initialize the fake HTTP request object.
 
@@ -95,6 +103,230 @@ class FakeHTTPRequest(object):
         self._headers[key] = header
 
 
+class ResponseCache(object):
+    """Bounded LRU cache for revalidatable responses.
+
+    The cache maps request signatures to responses. When full, the least
+    recently used entry is evicted. All entries for a subtree can be
+    removed with invalidate, e.g. after a request changed server state.
+
+    """
+    def __init__(self, maxsize=256):
+        """Initialize the response cache.
+
+        maxsize -- Maximum number of cached responses.
+
+        """
+        self.maxsize = maxsize
+        self._cache = dict()
+        # cache keys, least recently used first
+        self._order = list()
+
+    def __len__(self):
+        """Return the number of cached responses."""
+        return len(self._cache)
+
+    def get(self, key):
+        """Return the cached response for key or None.
+
+        key -- Tuple (method, uri, request body).
+
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            # move key to the most recently used end
+            self._order.remove(key)
+            self._order.append(key)
+        return value
+
+    def set(self, key, value):
+        """Cache value under key, evicting the least recently used entry.
+
+        key -- Tuple (method, uri, request body).
+        value -- Response to cache.
+
+        """
+        if key in self._cache:
+            self._order.remove(key)
+        elif len(self._cache) >= self.maxsize:
+            del self._cache[self._order.pop(0)]
+        self._cache[key] = value
+        self._order.append(key)
+
+    def invalidate(self, uri):
+        """Remove all cached responses for the given uri and its subtree.
+
+        uri -- The uri prefix to remove cached responses for. Expected in
+               the same form as used in the cache keys.
+
+        """
+        stale = [key for key in self._order if key[1].startswith(uri)]
+        for key in stale:
+            del self._cache[key]
+            self._order.remove(key)
+
+    def clear(self):
+        """Remove all cached responses."""
+        self._cache.clear()
+        del self._order[:]
+
+
+# scheme://host:port prefixes keyed by (protocol, host, port); a client
+# contributes one entry, but make_absolute runs for every request
+_PREFIX_CACHE = dict()
+_PREFIX_CACHE_SIZE = 64
+
+
+class DigestCreator(object):
+    """Create digest authentication responses after RFC 2617.
+
+    The challenge values are expected as parsed by HTTPResponse._setauth
+    from a www-authenticate header: realm, nonce, opaque and algorithm,
+    where algorithm is a hashlib constructor.
+
+    This object has the following attributes:
+
+    response_digest -- The request-digest for the Authorization header.
+    entity_digest -- The request-digest for qop auth-int, covering the
+                     entity body.
+
+    """
+    def __init__(self, challenge, user, password, method, uri,
+                 headers=None, entity_body=""):
+        """Initialize the DigestCreator.
+
+        challenge -- Object with realm, nonce, opaque and algorithm
+                     attributes, e.g. an HTTPResponse to a 401.
+        user -- User name to authenticate with.
+        password -- Password for user.
+        method -- Uppercase HTTP method of the request to authorize.
+        uri -- Request URI the digest is computed for.
+        headers -- Mapping with the headers of the request, if needed.
+        entity_body -- The request body, for the auth-int digest.
+
+        """
+        self.realm = challenge.realm
+        self.nonce = challenge.nonce
+        self.opaque = challenge.opaque
+        self.algorithm = challenge.algorithm
+        self.user = user
+        self.password = password
+        self.method = method
+        self.uri = uri
+        if headers is None:
+            headers = dict()
+        # entity_info and entity_digest look headers up several times per
+        # digest: lowercase the keys once instead of scanning per lookup
+        items_iterator = headers.iteritems() if PYTHON2 else headers.items()
+        self._headers = dict((key.lower(), value)
+                             for (key, value) in items_iterator)
+        self.entity_body = entity_body
+        # RFC 2617, 3.2.2.2 A1
+        # A1 = unq(username-value) ":" unq(realm-value) ":" passwd
+        self.A1 = "%s:%s:%s" % (user, self.realm, password)
+        # RFC 2617, 3.2.2.3 A2
+        # A2 = Method ":" digest-uri-value
+        self.A2 = "%s:%s" % (method, uri)
+        # A1 and A2 are fixed: encode them once so repeated hashing
+        # skips the per-call UTF-8 encode in H
+        self._A1_bytes = self.A1.encode("utf-8")
+        self._A2_bytes = self.A2.encode("utf-8")
+        # every input to the digests is fixed at construction, so each
+        # digest is computed at most once and cached on first access
+        self._H_A1 = None
+        self._response_digest = None
+        self._entity_info = None
+        self._entity_digest = None
+
+    def __getitem__(self, name):
+        """Return the request header name or an empty string.
+
+        name -- Case-insensitive name of the header.
+
+        """
+        return self._headers.get(name.lower(), "")
+
+    def H(self, value):
+        """Return the hexadecimal digest of value.
+
+        value -- String to hash with the challenge's algorithm.
+
+        """
+        # RFC 2617, 3.2.1 The WWW-Authenticate Response Header
+        # H(data) = <algorithm>(data)
+        if not isinstance(value, bytes):
+            value = value.encode("utf-8")
+        return self.algorithm(value).hexdigest()
+
+    def KD(self, secret, data):
+        """Return the keyed digest of data under secret.
+
+        secret -- The secret, usually H(A1).
+        data -- The data to digest.
+
+        """
+        # RFC 2617, 3.2.1 The WWW-Authenticate Response Header
+        # KD(secret, data) = H(concat(secret, ":", data))
+        return self.H("%s:%s" % (secret, data))
+
+    @property
+    def HA1(self):
+        """Return H(A1), computing it on first access."""
+        if self._H_A1 is None:
+            self._H_A1 = self.H(self._A1_bytes)
+        return self._H_A1
+
+    @property
+    def response_digest(self):
+        """Return the request-digest for this request."""
+        if self._response_digest is not None:
+            return self._response_digest
+        # RFC 2617, 3.2.2.1 Request-Digest
+        # request-digest = KD(H(A1), unq(nonce-value) ":" H(A2))
+        digest = self.KD(self.HA1,
+                         "%s:%s" % (self.nonce, self.H(self._A2_bytes)))
+        self._response_digest = digest
+        return digest
+
+    @property
+    def entity_info(self):
+        """Return the hashed entity-info of the request."""
+        if self._entity_info is not None:
+            return self._entity_info
+        # RFC 2069, 2.1.2 The Authorization Request Header
+        # entity-info = H(
+        #     digest-uri-value ":"
+        #     media-type ":"
+        #     *DIGIT ":"
+        #     content-coding ":"
+        #     last-modified ":"
+        #     expires
+        # )
+        info = "%s:%s:%s:%s:%s:%s" % (
+            self.uri,
+            self["content-type"],
+            self["content-length"],
+            self["content-encoding"],
+            self["last-modified"],
+            self["expires"],
+        )
+        self._entity_info = self.H(info)
+        return self._entity_info
+
+    @property
+    def entity_digest(self):
+        """Return the entity-digest covering the request body."""
+        if self._entity_digest is not None:
+            return self._entity_digest
+        # RFC 2069, 2.1.2 The Authorization Request Header
+        # entity-digest = KD(H(A1), unq(nonce-value) ":" Method ":"
+        #                    date-value ":" entity-info ":" H(entity-body))
+        data = "%s:%s:%s:%s:%s" % (self.nonce, self.method, self["date"],
+                                   self.entity_info, self.H(self.entity_body))
+        self._entity_digest = self.KD(self.HA1, data)
+        return self._entity_digest
+
+
 def make_absolute(httpclient, uri):
     """Return correct absolute URI.
 
@@ -102,66 +334,65 @@ def make_absolute(httpclient, uri):
     uri -- The destination path.
 
     """
-    netloc = "%s:%d" % (httpclient.host, httpclient.port)
-    parts = (httpclient.protocol, netloc, uri, None, None)
-    return urlunsplit(parts)
-
-
-class Multipart(object):
-    def __init__(self, data, default_encoding="ascii", with_filenames=False):
-        self.data = data
-        self.default_encoding = default_encoding
-        self.with_filenames = with_filenames
-        self._mp = MIMEMultipart("form-data")
-        self._files = list()
-
-    def _create_non_file_parts(self):
-        items_iterator = self.data.iteritems() if PYTHON2 else self.data.items()
-        for (key, data) in items_iterator:
-            # Are there explicit encodings/content-types given?
-            # Note: Cannot do a (value, encoding) = value here as fileobjects 
-            # then would get iterated, which is not what we want.
-            if isinstance(data, tuple) and (len(data) == 2):
-                (value, encoding) = data
-            else:
-                (value, encoding) = (data, None)
-            # collect file-like objects
-            if hasattr(value, "read"):
-                self._files.append((key, value, encoding))
-            # no file-like object
-            else:
-                if isinstance(value, MIMEBase):
-                    part = value
-                else:
-                    encoding = encoding if encoding else default_encoding
-                    part = MIMEText(value, "plain", encoding)
-                add_disposition(part, key)
-                self._mp.attach(part)
-
-    def _add_disposition(self, part, name, filename=None,
-                         disposition="form-data"):
-        """Add a Content-Disposition header to the part.
+    key = (httpclient.protocol, httpclient.host, httpclient.port)
+    prefix = _PREFIX_CACHE.get(key)
+    if prefix is None:
+        if len(_PREFIX_CACHE) >= _PREFIX_CACHE_SIZE:
+            _PREFIX_CACHE.clear()
+        prefix = "%s://%s:%d" % key
+        _PREFIX_CACHE[key] = prefix
+    # same rule urlunsplit applies when joining a netloc with a path
+    if uri and not uri.startswith("/"):
+        uri = "/%s" % uri
+    return prefix + uri
 
-        part -- Part to add header to.
-        name -- Name of the part.
-        filename -- Add this filename as parameter, if given.
-        disposition -- Value of the content-disposition header.
 
-        """
-        # RFC 2388 Returning Values from Forms: multipart/form-data
-        # Each part is expected to contain a content-disposition header
-        # [RFC 2183] where the disposition type is "form-data", and where the
-        # disposition contains an (additional) parameter of "name", where the
-        # value of that parameter is the original field name in the form.
-        params = dict(name=name)
-        if self.with_filenames and (filename is not None):
-            # RFC 2388 Returning Values from Forms: multipart/form-data
-            # The original local file name may be supplied as well, either as
-            # a "filename" parameter either of the "content-disposition: 
-            # form-data" header or, in the case of multiple files, in a
-            # "content-disposition: file" header of the subpart.
-            params["filename"] = path.basename(filename)
-        part.add_header("Content-Disposition", disposition, **params)
+# multiple of the 57 raw bytes that make one 76 character base64 line
+_B64_CHUNKSIZE = 57 * 1024
+
+
+class _PayloadGenerator(Generator):
+    """Generator that omits the headers of the outermost message.
+
+    The headers of the multipart itself are transmitted as HTTP headers;
+    only the payload with its boundaries belongs into the request body.
+
+    """
+    def _write_headers(self, msg):
+        # this generator only serializes the outermost message itself;
+        # swallow its headers and the blank line following them
+        pass
+
+    def clone(self, fp):
+        # subparts are flattened through clones and keep their headers
+        if PYTHON2:
+            return Generator(fp, self._mangle_from_, self._maxheaderlen)
+        return Generator(fp, self._mangle_from_, None, policy=self.policy)
+
+
+def _encode_file_payload(part, fileobject):
+    """Set the base64 encoded content of fileobject as part's payload.
+
+    part -- MIMEBase part to set the payload on.
+    fileobject -- File-like object to read the content from.
+
+    The file is encoded chunk by chunk, so the complete raw data and its
+    base64 expansion are never held in memory at the same time.
+
+    """
+    encoded = list()
+    while True:
+        chunk = fileobject.read(_B64_CHUNKSIZE)
+        if not chunk:
+            break
+        if not isinstance(chunk, bytes):
+            try:
+                chunk = chunk.encode("ascii")
+            except UnicodeError:
+                chunk = chunk.encode("raw-unicode-escape")
+        encoded.append(body_encode(chunk))
+    part.set_payload("".join(encoded))
+    part["Content-Transfer-Encoding"] = "base64"
 
 
 def make_multipart(content, default_encoding="ascii", with_filenames=False):
@@ -212,8 +443,7 @@ def make_multipart(content, default_encoding="ascii", with_filenames=False):
             content_type = DEFAULT_CONTENT_TYPE
         (maintype, subtype) = content_type.split("/")
         part = MIMEBase(maintype, subtype)
-        part.set_payload(fileobject.read())
-        encode_base64(part)
+        _encode_file_payload(part, fileobject)
         filename = getattr(fileobject, "name", None)
         kwargs = dict()
         if multiple:
@@ -268,14 +498,59 @@ def make_multipart(content, default_encoding="ascii", with_filenames=False):
             mixed.attach(part)
         mime.attach(mixed)
 
-    # mime.items must be called after mime.as_string when the headers shall
+    # serialize without the outermost headers: these will later be added
+    # by httplib, and slicing them off a complete as_string would copy
+    # the whole payload once more
+    buf = StringIO()
+    _PayloadGenerator(buf).flatten(mime)
+    # mime.items must be called after flattening when the headers shall
     # contain the boundary
-    complete_mime = mime.as_string()
     headers = dict(mime.items())
-    # trim headers from create mime as these will later be added by httplib.
-    payload_start = complete_mime.index("\n\n") + 2
-    payload = complete_mime[payload_start:]
-    return (headers, payload)
+    return (headers, buf.getvalue())
+
+
+def normalize_href(href):
+    """Return the normalized path of a href for comparison purposes.
+
+    href -- href text from a multistatus response or a request uri. May be
+            an absolute URI or an absolute path, percent-encoded or not.
+
+    The query and fragment parts and the trailing slash of collections are
+    removed and percent-encoding is resolved.
+
+    """
+    # RFC 2518, 12.3 href XML Element
+    # <!ELEMENT href (#PCDATA)>
+    path_ = unquote(urlsplit(href)[2])
+    if path_.endswith("/"):
+        path_ = path_[:-1]
+    return path_
+
+
+def get_file_size(fileobject):
+    """Return the number of bytes left to read from a file-like object.
+
+    fileobject -- File-like object to inspect. The read position is left
+                  untouched.
+
+    Return None, when the size cannot be determined, e.g. for pipes, sockets
+    or objects that are neither seekable nor backed by a file descriptor.
+
+    """
+    try:
+        size = fstat(fileobject.fileno()).st_size
+    except (AttributeError, EnvironmentError, ValueError):
+        pass
+    else:
+        return size - fileobject.tell()
+    try:
+        position = fileobject.tell()
+        fileobject.seek(0, 2)
+        size = fileobject.tell() - position
+        fileobject.seek(position)
+    except (AttributeError, EnvironmentError, ValueError):
+        return None
+    return size
 
 
 def extract_namespace(key):
@@ -286,10 +561,17 @@ def extract_namespace(key):
     """
     if not key.startswith("{"):
         return None
-    return key[1:].split("}")[0]
+    end = key.find("}", 1)
+    if end < 0:
+        return key[1:]
+    return key[1:end]
+
+
+# RFC 2518, 9.2 Depth Header
+_DEFAULT_DEPTHS = frozenset(("0", "1", "infinity"))
 
 
-def get_depth(depth, allowed=("0", "1", "infinity")):
+def get_depth(depth, allowed=_DEFAULT_DEPTHS):
     """Return string with depth.
 
     depth -- Depth value to check.
@@ -298,6 +580,9 @@ def get_depth(depth, allowed=("0", "1", "infinity")):
     Raise ValueError, if an illegal depth was given.
 
     """
+    # canonical strings pass through without the str/lower round-trip
+    if isinstance(depth, str) and (depth in allowed):
+        return depth
     depth = str(depth).lower()
     if depth not in allowed:
         raise ValueError("illegal depth %s" % depth)